@@ -1,243 +1,530 @@
 #!/usr/bin/env python3
 """
-Simple Flask server for Schema Extraction Engine
+Simple ASGI server for Schema Extraction Engine
+Requires: pip install starlette uvicorn[standard] brotli-asgi 'orjson>=3.9'
+Optional: pip install cbor2 (CBOR responses for clients sending Accept: application/cbor)
 """
-from flask import Flask, request, jsonify, send_from_directory
-from flask_cors import CORS
-import json
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import FileResponse, Response
+from starlette.routing import Route
+from brotli_asgi import BrotliMiddleware
+import orjson
+import uvicorn
+import atexit
+import hashlib
+import logging
 import os
-from datetime import datetime
+import queue
+import re
+import time
+from functools import lru_cache
+from logging.handlers import QueueHandler, QueueListener
+from types import MappingProxyType
 
-app = Flask(__name__)
-CORS(app)
+try:
+    import cbor2
+except ImportError:
+    cbor2 = None
 
-def generate_fallback_schema(exam_name):
-    """Generate a realistic fallback schema based on exam type"""
+def _configure_logging():
+    """Send log records through a queue drained by one background thread"""
+    # uvicorn workers execute this file twice (as __mp_main__ and under the
+    # import string); the second run must not start another listener
+    root = logging.getLogger()
+    if any(isinstance(handler, QueueHandler) for handler in root.handlers):
+        return
     
-    # Normalize exam name
-    normalized_name = ' '.join(word.capitalize() for word in exam_name.replace('-', ' ').replace('_', ' ').split())
-    
-    lower_name = exam_name.lower()
+    # Request handlers only enqueue records; the listener does the blocking
+    # writes to stderr. The handler is attached directly rather than through
+    # basicConfig, which is a no-op when the host already configured logging
+    log_queue = queue.SimpleQueue()
+    queue_handler = QueueHandler(log_queue)
+    queue_handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(name)s: %(message)s'))
+    root.addHandler(queue_handler)
+    root.setLevel(logging.INFO)
     
+    listener = QueueListener(log_queue, logging.StreamHandler())
+    listener.start()
+    atexit.register(listener.stop)
+
+_configure_logging()
+
+logger = logging.getLogger("schema")
+
+UI_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'schema-extraction-dev-tool.html')
+
+def _thaw(obj):
+    """orjson default hook for the read-only schema templates"""
+    if isinstance(obj, MappingProxyType):
+        return dict(obj)
+    raise TypeError
+
+def _json(obj, status=200):
+    """Serialize obj with orjson into a JSON response"""
+    return Response(orjson.dumps(obj, default=_thaw), status_code=status, media_type='application/json')
+
+def _accept_quality(accept, mimetype):
+    """Quality the Accept header gives mimetype; the most specific range wins"""
+    main_type = mimetype.split('/')[0]
+    best_specificity, quality = -1, 0.0
+    for entry in accept.split(','):
+        media_range, *params = entry.strip().split(';')
+        media_range = media_range.strip().lower()
+        if media_range == mimetype:
+            specificity = 2
+        elif media_range == main_type + '/*':
+            specificity = 1
+        elif media_range == '*/*':
+            specificity = 0
+        else:
+            continue
+        q = 1.0
+        for param in params:
+            name, _, value = param.strip().partition('=')
+            if name.strip() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if specificity > best_specificity:
+            best_specificity, quality = specificity, q
+    return quality
+
+def _negotiated_media_type(request):
+    """application/cbor when the client prefers it and cbor2 is available, else application/json"""
+    accept = request.headers.get('accept', '*/*')
+    if cbor2 is not None and _accept_quality(accept, 'application/cbor') > _accept_quality(accept, 'application/json'):
+        return 'application/cbor'
+    return 'application/json'
+
+def _negotiated(request, obj, status=200):
+    """Respond with CBOR when the client prefers it, JSON otherwise"""
+    if _negotiated_media_type(request) == 'application/cbor':
+        response = Response(cbor2.dumps(obj, default=_cbor_default), status_code=status, media_type='application/cbor')
+    else:
+        response = _json(obj, status)
+    response.headers.add_vary_header('Accept')
+    return response
+
+def _freeze(obj):
+    """Recursively turn dicts into read-only mappings and lists into tuples"""
+    if isinstance(obj, dict):
+        return MappingProxyType({key: _freeze(value) for key, value in obj.items()})
+    if isinstance(obj, list):
+        return tuple(_freeze(item) for item in obj)
+    return obj
+
+# Frozen template behind each pre-serialized fragment, for encoders other
+# than orjson
+_PRERENDERED = {}
+
+def _prerender(documents):
+    """Serialize a frozen template once so orjson splices in its bytes per response"""
+    fragment = orjson.Fragment(orjson.dumps(documents, default=_thaw))
+    _PRERENDERED[fragment] = documents
+    return fragment
+
+def _cbor_default(encoder, value):
+    """cbor2 default hook that encodes fragments from their frozen template"""
+    if isinstance(value, orjson.Fragment) and value in _PRERENDERED:
+        encoder.encode(_PRERENDERED[value])
+    else:
+        raise TypeError(f"Cannot serialize {type(value).__name__} to CBOR")
+
+# Fallback schemas are deterministic per exam name, so clients and proxies may
+# reuse them for a day
+_SCHEMA_MAX_AGE = 86400
+
+# Upper bound on exam names accepted by /api/generate-schemas
+_MAX_BULK_EXAMS = 100
+
+# Longest exam name accepted; names are cache keys, so unbounded ones would
+# let clients pin arbitrary amounts of memory
+_MAX_EXAM_NAME_LEN = 200
+
+# (second, ISO string) of the last formatted timestamp; swapped as one tuple
+# so concurrent readers never see a mismatched pair
+_ts_cache = (0, "")
+
+def _now_iso():
+    """Current UTC time as an ISO 8601 string, formatted at most once per second"""
+    global _ts_cache
+    now = int(time.time())
+    second, stamp = _ts_cache
+    if second != now:
+        stamp = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(now))
+        _ts_cache = (now, stamp)
+    return stamp
+
+# Document requirements per exam bucket, built once at import and shared
+# read-only between requests
+_TEMPLATES = {
     # Banking exams (IBPS, SBI, etc.)
-    if any(keyword in lower_name for keyword in ['ibps', 'bank', 'sbi', 'rbi']):
-        requirements = [
-            {
-                "type": "photograph",
-                "requirements": {
-                    "format": ["JPG", "JPEG"],
-                    "size_kb": {"min": 20, "max": 50},
-                    "dimensions": "200x230 pixels",
-                    "color": "color",
-                    "background": "light",
-                    "notes": ["Recent colored photograph", "Passport size", "Clear face visibility"]
-                }
-            },
-            {
-                "type": "signature",
-                "requirements": {
-                    "format": ["JPG", "JPEG"],
-                    "size_kb": {"min": 10, "max": 20},
-                    "dimensions": "140x60 pixels",
-                    "background": "white",
-                    "notes": ["Clear signature in black ink", "Sign on white paper"]
-                }
-            },
-            {
-                "type": "thumb_impression",
-                "requirements": {
-                    "format": ["JPG", "JPEG"],
-                    "size_kb": {"min": 10, "max": 20},
-                    "dimensions": "240x240 pixels",
-                    "background": "white",
-                    "notes": ["Left thumb impression", "Clear impression on white paper"]
-                }
+    "bank": [
+        {
+            "type": "photograph",
+            "requirements": {
+                "format": ["JPG", "JPEG"],
+                "size_kb": {"min": 20, "max": 50},
+                "dimensions": "200x230 pixels",
+                "color": "color",
+                "background": "light",
+                "notes": ["Recent colored photograph", "Passport size", "Clear face visibility"]
             }
-        ]
-    
+        },
+        {
+            "type": "signature",
+            "requirements": {
+                "format": ["JPG", "JPEG"],
+                "size_kb": {"min": 10, "max": 20},
+                "dimensions": "140x60 pixels",
+                "background": "white",
+                "notes": ["Clear signature in black ink", "Sign on white paper"]
+            }
+        },
+        {
+            "type": "thumb_impression",
+            "requirements": {
+                "format": ["JPG", "JPEG"],
+                "size_kb": {"min": 10, "max": 20},
+                "dimensions": "240x240 pixels",
+                "background": "white",
+                "notes": ["Left thumb impression", "Clear impression on white paper"]
+            }
+        }
+    ],
+
     # SSC exams
-    elif 'ssc' in lower_name:
-        requirements = [
-            {
-                "type": "photograph",
-                "requirements": {
-                    "format": ["JPEG"],
-                    "size_kb": {"min": 4, "max": 40},
-                    "dimensions": "3.5x4.5 cm",
-                    "color": "color",
-                    "background": "light",
-                    "notes": ["Recent colored photograph", "Passport size"]
-                }
-            },
-            {
-                "type": "signature",
-                "requirements": {
-                    "format": ["JPEG"],
-                    "size_kb": {"min": 1, "max": 12},
-                    "dimensions": "4x2 cm",
-                    "background": "white",
-                    "notes": ["Clear signature in black ink"]
-                }
+    "ssc": [
+        {
+            "type": "photograph",
+            "requirements": {
+                "format": ["JPEG"],
+                "size_kb": {"min": 4, "max": 40},
+                "dimensions": "3.5x4.5 cm",
+                "color": "color",
+                "background": "light",
+                "notes": ["Recent colored photograph", "Passport size"]
             }
-        ]
-    
+        },
+        {
+            "type": "signature",
+            "requirements": {
+                "format": ["JPEG"],
+                "size_kb": {"min": 1, "max": 12},
+                "dimensions": "4x2 cm",
+                "background": "white",
+                "notes": ["Clear signature in black ink"]
+            }
+        }
+    ],
+
     # Medical/Engineering exams
-    elif any(keyword in lower_name for keyword in ['neet', 'jee', 'gate']):
-        requirements = [
-            {
-                "type": "photograph",
-                "requirements": {
-                    "format": ["JPG", "JPEG"],
-                    "size_kb": {"min": 10, "max": 200},
-                    "dimensions": "Passport size",
-                    "color": "color",
-                    "background": "white",
-                    "notes": ["Recent photograph", "Face should be clearly visible", "No sunglasses or hat"]
-                }
-            },
-            {
-                "type": "signature",
-                "requirements": {
-                    "format": ["JPG", "JPEG"],
-                    "size_kb": {"min": 4, "max": 30},
-                    "background": "white",
-                    "notes": ["Clear signature in blue or black ink"]
-                }
+    "med": [
+        {
+            "type": "photograph",
+            "requirements": {
+                "format": ["JPG", "JPEG"],
+                "size_kb": {"min": 10, "max": 200},
+                "dimensions": "Passport size",
+                "color": "color",
+                "background": "white",
+                "notes": ["Recent photograph", "Face should be clearly visible", "No sunglasses or hat"]
             }
-        ]
-    
+        },
+        {
+            "type": "signature",
+            "requirements": {
+                "format": ["JPG", "JPEG"],
+                "size_kb": {"min": 4, "max": 30},
+                "background": "white",
+                "notes": ["Clear signature in blue or black ink"]
+            }
+        }
+    ],
+
     # UPSC/Civil Services
-    elif any(keyword in lower_name for keyword in ['upsc', 'civil', 'ias', 'ips']):
-        requirements = [
-            {
-                "type": "photograph",
-                "requirements": {
-                    "format": ["JPG", "JPEG"],
-                    "size_kb": {"min": 3, "max": 50},
-                    "dimensions": "5x7 cm",
-                    "color": "color",
-                    "background": "white",
-                    "notes": ["Recent photograph", "Professional attire preferred", "Clear face visibility"]
-                }
-            },
-            {
-                "type": "signature",
-                "requirements": {
-                    "format": ["JPG", "JPEG"],
-                    "size_kb": {"min": 1, "max": 10},
-                    "dimensions": "4x2 cm",
-                    "background": "white",
-                    "notes": ["Signature in black ink", "Sign on white paper"]
-                }
+    "civil": [
+        {
+            "type": "photograph",
+            "requirements": {
+                "format": ["JPG", "JPEG"],
+                "size_kb": {"min": 3, "max": 50},
+                "dimensions": "5x7 cm",
+                "color": "color",
+                "background": "white",
+                "notes": ["Recent photograph", "Professional attire preferred", "Clear face visibility"]
             }
-        ]
-    
-    # Generic requirements
-    else:
-        requirements = [
-            {
-                "type": "photograph",
-                "requirements": {
-                    "format": ["JPG", "JPEG", "PNG"],
-                    "size_kb": {"min": 10, "max": 100},
-                    "dimensions": "Passport size",
-                    "color": "color",
-                    "notes": ["Recent photograph", "Clear face visibility"]
-                }
-            },
-            {
-                "type": "signature",
-                "requirements": {
-                    "format": ["JPG", "JPEG", "PNG"],
-                    "size_kb": {"min": 5, "max": 50},
-                    "background": "white",
-                    "notes": ["Clear signature"]
-                }
+        },
+        {
+            "type": "signature",
+            "requirements": {
+                "format": ["JPG", "JPEG"],
+                "size_kb": {"min": 1, "max": 10},
+                "dimensions": "4x2 cm",
+                "background": "white",
+                "notes": ["Signature in black ink", "Sign on white paper"]
             }
-        ]
+        }
+    ]
+}
+_TEMPLATES = {bucket: _prerender(_freeze(documents)) for bucket, documents in _TEMPLATES.items()}
+
+# Generic requirements, used when no bucket keyword matches
+_GENERIC_DOCUMENTS = _prerender(_freeze([
+    {
+        "type": "photograph",
+        "requirements": {
+            "format": ["JPG", "JPEG", "PNG"],
+            "size_kb": {"min": 10, "max": 100},
+            "dimensions": "Passport size",
+            "color": "color",
+            "notes": ["Recent photograph", "Clear face visibility"]
+        }
+    },
+    {
+        "type": "signature",
+        "requirements": {
+            "format": ["JPG", "JPEG", "PNG"],
+            "size_kb": {"min": 5, "max": 50},
+            "background": "white",
+            "notes": ["Clear signature"]
+        }
+    }
+]))
+
+# Returned when schema generation itself fails
+_BASIC_FALLBACK_DOCUMENTS = _prerender(_freeze([
+    {
+        "type": "photograph",
+        "requirements": {
+            "format": ["JPG", "JPEG"],
+            "size_kb": {"min": 10, "max": 100},
+            "dimensions": "Passport size",
+            "color": "color",
+            "notes": ["Recent photograph"]
+        }
+    }
+]))
+
+# One pass over the name: each alternative looks ahead for any keyword of its
+# bucket, so earlier buckets still win when several keywords are present
+# (e.g. "ssc bank" is a banking exam). The named group that matched is the bucket.
+_CLASSIFIER_RE = re.compile(
+    r'(?=.*?(?P<bank>ibps|bank|sbi|rbi))'
+    r'|(?=.*?(?P<ssc>ssc))'
+    r'|(?=.*?(?P<med>neet|jee|gate))'
+    r'|(?=.*?(?P<civil>upsc|civil|ias|ips))',
+    re.DOTALL
+)
+
+# Separators in exam names that display as spaces
+_NORM_TBL = str.maketrans('-_', '  ')
+
+@lru_cache(maxsize=1024)
+def _classify(exam_name):
+    """Map an exam name to its template bucket, or None for generic exams"""
+    match = _CLASSIFIER_RE.match(exam_name.lower())
+    return match and match.lastgroup
+
+def generate_fallback_schema(exam_name):
+    """Generate a realistic fallback schema based on exam type"""
+    
+    # Normalize exam name
+    normalized_name = ' '.join(exam_name.translate(_NORM_TBL).split()).title()
+    
+    documents = _TEMPLATES.get(_classify(exam_name), _GENERIC_DOCUMENTS)
     
     return {
         "exam": normalized_name,
-        "documents": requirements,
+        "documents": documents,
         "extractedFrom": "Intelligent Fallback System",
-        "extractedAt": datetime.now().isoformat()
+        "extractedAt": _now_iso()
     }
 
-@app.route('/')
-def serve_ui():
+@lru_cache(maxsize=1024)
+def _schema_etag(exam_name, media_type):
+    """Weak ETag over the media type and the parts of an exam's fallback schema that never change"""
+    schema = generate_fallback_schema(exam_name)
+    payload = orjson.dumps([media_type, schema['exam'], schema['documents']], default=_thaw)
+    return f'W/"{hashlib.blake2b(payload, digest_size=16).hexdigest()}"'
+
+def _etag_matches(request, etag):
+    """Whether If-None-Match names etag, using weak comparison"""
+    header = request.headers.get('if-none-match')
+    if not header:
+        return False
+    tags = [tag.strip().removeprefix('W/') for tag in header.split(',')]
+    return '*' in tags or etag.removeprefix('W/') in tags
+
+def _not_modified(request, headers):
+    """304 response carrying the same Vary set the full response would get"""
+    response = Response(status_code=304, headers=headers)
+    response.headers.add_vary_header('Accept')
+    # BrotliMiddleware only adds this to bodies it compresses, which a 304 lacks
+    accept_encoding = request.headers.get('accept-encoding', '')
+    if 'br' in accept_encoding or 'gzip' in accept_encoding:
+        response.headers.add_vary_header('Accept-Encoding')
+    return response
+
+async def serve_ui(request):
     """Serve the HTML dev tool"""
-    return send_from_directory('.', 'schema-extraction-dev-tool.html')
+    return FileResponse(UI_PATH)
+
+async def _read_json_object(request):
+    """Decode the request body as a JSON object, or None if it is not one"""
+    try:
+        raw = await request.body()
+        data = orjson.loads(raw) if raw else {}
+    except orjson.JSONDecodeError:
+        return None
+    return data if isinstance(data, dict) else None
 
-@app.route('/api/generate-schema', methods=['POST'])
-def generate_schema():
-    """Generate exam schema endpoint"""
+async def generate_schema(request):
+    """Generate exam schema endpoint; GET/HEAD take examName as a query parameter"""
+    cacheable = request.method in ('GET', 'HEAD')
+    if cacheable:
+        data = dict(request.query_params)
+    else:
+        data = await _read_json_object(request)
+    if data is None:
+        return _negotiated(request, {
+            'success': False,
+            'error': 'Request body must be a JSON object'
+        }, 400)
+    
     try:
-        data = request.get_json()
         exam_name = data.get('examName', '').strip()
         
         if not exam_name:
-            return jsonify({
+            return _negotiated(request, {
                 'success': False,
                 'error': 'Exam name is required'
-            }), 400
+            }, 400)
         
-        print(f"Generating schema for: {exam_name}")
+        if len(exam_name) > _MAX_EXAM_NAME_LEN:
+            return _negotiated(request, {
+                'success': False,
+                'error': f'Exam name must be at most {_MAX_EXAM_NAME_LEN} characters'
+            }, 400)
+        
+        etag = _schema_etag(exam_name, _negotiated_media_type(request))
+        cache_headers = {'Cache-Control': f'public, max-age={_SCHEMA_MAX_AGE}', 'ETag': etag}
+        
+        if cacheable and _etag_matches(request, etag):
+            return _not_modified(request, cache_headers)
+        
+        logger.info("Generating schema for: %s", exam_name)
         
         # Generate intelligent fallback schema
         schema = generate_fallback_schema(exam_name)
         
-        print(f"Generated schema for {schema['exam']}")
+        logger.info("Generated schema for %s", schema['exam'])
         
-        return jsonify({
+        response = _negotiated(request, {
             'success': True,
             'schema': schema,
             'message': f"Generated schema for {schema['exam']}",
             'note': 'Using intelligent pattern matching - real web extraction available via Node.js version'
         })
+        response.headers.update(cache_headers)
+        return response
         
-    except Exception as e:
-        print(f"Error generating schema: {e}")
+    except Exception:
+        logger.exception("Error generating schema")
         
         # Return basic fallback even on error
         fallback = {
             "exam": data.get('examName', 'Unknown Exam'),
-            "documents": [
-                {
-                    "type": "photograph",
-                    "requirements": {
-                        "format": ["JPG", "JPEG"],
-                        "size_kb": {"min": 10, "max": 100},
-                        "dimensions": "Passport size",
-                        "color": "color",
-                        "notes": ["Recent photograph"]
-                    }
-                }
-            ],
+            "documents": _BASIC_FALLBACK_DOCUMENTS,
             "extractedFrom": "Basic Fallback",
-            "extractedAt": datetime.now().isoformat()
+            "extractedAt": _now_iso()
         }
         
-        return jsonify({
+        return _negotiated(request, {
             'success': True,
             'schema': fallback,
             'message': 'Generated basic fallback schema',
             'warning': 'Error occurred during generation'
         })
 
-@app.route('/health')
-def health_check():
+async def generate_schemas(request):
+    """Generate schemas for several exams in one request"""
+    data = await _read_json_object(request)
+    exam_names = data.get('examNames') if data is not None else None
+    
+    if not isinstance(exam_names, list) or not exam_names:
+        return _negotiated(request, {
+            'success': False,
+            'error': 'examNames must be a non-empty list'
+        }, 400)
+    
+    if len(exam_names) > _MAX_BULK_EXAMS:
+        return _negotiated(request, {
+            'success': False,
+            'error': f'At most {_MAX_BULK_EXAMS} exam names per request'
+        }, 400)
+    
+    if not all(isinstance(name, str) and name.strip() for name in exam_names):
+        return _negotiated(request, {
+            'success': False,
+            'error': 'Each exam name must be a non-empty string'
+        }, 400)
+    
+    exam_names = [name.strip() for name in exam_names]
+    if any(len(name) > _MAX_EXAM_NAME_LEN for name in exam_names):
+        return _negotiated(request, {
+            'success': False,
+            'error': f'Each exam name must be at most {_MAX_EXAM_NAME_LEN} characters'
+        }, 400)
+    
+    logger.info("Generating %d schemas", len(exam_names))
+    
+    schemas = [generate_fallback_schema(name) for name in exam_names]
+    
+    return _negotiated(request, {
+        'success': True,
+        'schemas': schemas,
+        'message': f"Generated {len(schemas)} schemas"
+    })
+
+async def health_check(request):
     """Health check endpoint"""
-    return jsonify({
+    return _json({
         'status': 'OK',
-        'timestamp': datetime.now().isoformat(),
+        'timestamp': _now_iso(),
         'message': 'Schema Extraction Server is running'
     })
 
+app = Starlette(
+    debug=os.environ.get('SCHEMA_SERVER_DEBUG', '').lower() in ('1', 'true', 'yes'),
+    routes=[
+        Route('/', serve_ui),
+        Route('/api/generate-schema', generate_schema, methods=['GET', 'POST']),
+        Route('/api/generate-schemas', generate_schemas, methods=['POST']),
+        Route('/health', health_check),
+    ],
+    middleware=[
+        Middleware(CORSMiddleware, allow_origins=['*'], allow_methods=['*'], allow_headers=['*']),
+        Middleware(BrotliMiddleware, minimum_size=256, gzip_fallback=True),
+    ]
+)
+
 if __name__ == '__main__':
-    print("🚀 Schema Extraction Server starting...")
-    print("   Local:    http://localhost:3001")
-    print("   API:      http://localhost:3001/api/generate-schema")
-    print("   Health:   http://localhost:3001/health")
-    print("\n💡 Open http://localhost:3001 in your browser to use the dev tool!")
+    logger.info("🚀 Schema Extraction Server starting...")
+    logger.info("   Local:    http://localhost:3001")
+    logger.info("   API:      http://localhost:3001/api/generate-schema")
+    logger.info("   Bulk API: http://localhost:3001/api/generate-schemas")
+    logger.info("   Health:   http://localhost:3001/health")
+    logger.info("💡 Open http://localhost:3001 in your browser to use the dev tool!")
     
-    app.run(host='0.0.0.0', port=3001, debug=True)
\ No newline at end of file
+    # Workers re-import this module by name, so pass an import string rather than app
+    uvicorn.run(
+        'schema-extraction-server:app',
+        host='0.0.0.0',
+        port=3001,
+        workers=int(os.environ.get('SCHEMA_SERVER_WORKERS', 4)),
+        loop='auto'
+    )
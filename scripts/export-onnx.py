@@ -1,47 +1,104 @@
 """
 Python script to export ONNX models for schema inference
-Requires: pip install transformers optimum[exporters] onnx onnxruntime
+Requires: pip install transformers optimum[exporters,onnxruntime] onnx onnxruntime
 
-This script exports DistilBERT and creates a stub for LayoutLM
+This script exports the models in MODEL_SPECS (DistilBERT) in parallel and creates a stub for LayoutLM
 For LayoutLM, you may need to download from HuggingFace directly
 """
 
 import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 try:
     from optimum.onnx import export
     from transformers import AutoTokenizer, AutoModelForTokenClassification
+    import onnxruntime as ort
+    from optimum.onnxruntime import ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
     print("✅ Required libraries found")
 except ImportError:
     print("❌ Missing libraries. Install with:")
-    print("pip install transformers optimum[exporters] onnx onnxruntime")
+    print("pip install transformers optimum[exporters,onnxruntime] onnx onnxruntime")
     exit(1)
 
 MODELS_DIR = Path("public/models")
 MODELS_DIR.mkdir(parents=True, exist_ok=True)
 
-def export_distilbert():
-    """Export DistilBERT to ONNX format"""
-    print("\n📦 Exporting DistilBERT to ONNX...")
+# (output name, HuggingFace model, export task) for each model exported via optimum
+MODEL_SPECS = [
+    ("distilbert", "distilbert-base-uncased", "feature-extraction"),
+]
+
+def optimize_onnx_model(source_path, output_path):
+    """Apply ONNX Runtime graph optimizations once and save the result"""
+    print(f"\n⚙️  Optimizing {source_path.name} with ONNX Runtime...")
+    
+    # EXTENDED rather than ALL: the layout rewrites ALL adds are specific to the
+    # CPU provider that ran them and break onnxruntime-web in the browser
+    sess_options = ort.SessionOptions()
+    sess_options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_EXTENDED
+    sess_options.optimized_model_filepath = str(output_path)
     
-    model_name = "distilbert-base-uncased"
-    output_path = MODELS_DIR / "distilbert.onnx"
+    ort.InferenceSession(str(source_path), sess_options, providers=["CPUExecutionProvider"])
+    
+    print(f"✅ Optimized model saved to {output_path}")
+
+def quantize_onnx_model(model_dir, file_name, save_dir):
+    """Dynamically quantize an ONNX model's weights to int8"""
+    print(f"\n🗜️  Quantizing {file_name} to int8...")
+    
+    qconfig = AutoQuantizationConfig.avx512_vnni(is_static=False, per_channel=True)
+    quantizer = ORTQuantizer.from_pretrained(model_dir, file_name=file_name)
+    quantizer.quantize(save_dir=save_dir, quantization_config=qconfig)
+    
+    quantized_path = Path(save_dir) / f"{Path(file_name).stem}_quantized.onnx"
+    print(f"✅ Quantized model saved to {quantized_path}")
+    return quantized_path
+
+def export_model(spec):
+    """Export, optimize and quantize one model from MODEL_SPECS to ONNX format"""
+    name, model_name, task = spec
+    print(f"\n📦 Exporting {model_name} to ONNX...")
+    
+    export_dir = MODELS_DIR / name
+    output_path = MODELS_DIR / f"{name}.onnx"
     
     try:
         from optimum.exporters.onnx import main_export
         
         main_export(
             model_name,
-            output=str(MODELS_DIR / "distilbert"),
-            task="feature-extraction",
+            output=str(export_dir),
+            task=task,
         )
-        
-        print(f"✅ DistilBERT exported to {output_path}")
     except Exception as e:
-        print(f"❌ Failed to export DistilBERT: {e}")
+        print(f"❌ Failed to export {model_name}: {e}")
         print("Creating placeholder file...")
         output_path.touch()
+        return
+    
+    # Intermediates stay out of public/ so they are never served or deployed
+    with tempfile.TemporaryDirectory() as work_dir:
+        work_dir = Path(work_dir)
+        final_path = export_dir / "model.onnx"
+        
+        try:
+            # Optimize the FP32 graph first so quantization sees the fused operators
+            optimized_path = work_dir / "model_optimized.onnx"
+            optimize_onnx_model(final_path, optimized_path)
+            final_path = optimized_path
+            
+            final_path = quantize_onnx_model(work_dir, optimized_path.name, work_dir / "int8")
+        except Exception as e:
+            print(f"⚠️  Failed to optimize/quantize {model_name}: {e}")
+            print(f"Falling back to {final_path.name}")
+        
+        shutil.copyfile(final_path, output_path)
+    
+    print(f"✅ {model_name} exported to {output_path}")
 
 def create_layoutlm_placeholder():
     """Create placeholder for LayoutLM (requires manual download)"""
@@ -59,7 +116,9 @@ if __name__ == "__main__":
     print("🚀 ONNX Model Export Script")
     print("=" * 50)
     
-    export_distilbert()
+    # Exports are independent, so each model gets its own process
+    with ProcessPoolExecutor(max_workers=min(os.cpu_count() or 1, len(MODEL_SPECS))) as executor:
+        list(executor.map(export_model, MODEL_SPECS))
     create_layoutlm_placeholder()
     
     print("\n" + "=" * 50)